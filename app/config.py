@@ -4,6 +4,7 @@ This module manages all application configuration from environment variables
 following the 12-factor app methodology. All configuration is loaded at startup.
 """
 
+import hmac
 import os
 from typing import Optional
 
@@ -15,24 +16,57 @@ class Settings:
         database_url: SQLite database path (default: /data/app.db)
         log_level: Python logging level (default: INFO)
         webhook_secret: Secret key for HMAC signature verification (required)
+        webhook_secret_bytes: Pre-encoded secret for the HMAC hot path
+        webhook_hmac: Pre-keyed HMAC-SHA256 context; verifiers .copy()
+            it per request instead of re-running key setup
     """
-    
+
+    # Fixed attribute set - no per-instance __dict__, which makes every
+    # settings.<attr> read on the hot paths a slot lookup instead of a
+    # dict lookup. Stays mutable because tests override these at runtime.
+    __slots__ = (
+        "database_url",
+        "log_level",
+        "_webhook_secret",
+        "webhook_secret_bytes",
+        "webhook_hmac",
+    )
+
     def __init__(self):
         # Database configuration - path where SQLite file is stored
         self.database_url: str = os.getenv("DATABASE_URL", "sqlite:////data/app.db")
-        
+
         # Logging configuration - verbosity level (DEBUG, INFO, WARNING, ERROR)
         self.log_level: str = os.getenv("LOG_LEVEL", "INFO")
-        
+
         # Webhook secret configuration - required for HMAC-SHA256 signature verification
         # Without this, /health/ready will return 503 Service Unavailable
         self.webhook_secret: Optional[str] = os.getenv("WEBHOOK_SECRET")
-        
+
         # Note: We allow app to start without WEBHOOK_SECRET but health check will fail
         # This is intentional - readiness probe will indicate service not ready
         if not self.webhook_secret:
             pass  # Service will be unhealthy until secret is provided
 
+    @property
+    def webhook_secret(self) -> Optional[str]:
+        """Secret key for HMAC signature verification."""
+        return self._webhook_secret
+
+    @webhook_secret.setter
+    def webhook_secret(self, value: Optional[str]):
+        # Cache the encoded form once so verify_signature doesn't re-encode
+        # the secret on every webhook call - it never changes per process
+        self._webhook_secret = value
+        self.webhook_secret_bytes: Optional[bytes] = value.encode() if value else None
+        # Pre-key an HMAC context as well: copying a keyed context is
+        # much cheaper than hmac.new's two key-padding hash rounds, and
+        # the key only changes when the secret does
+        self.webhook_hmac: Optional[hmac.HMAC] = (
+            hmac.new(self.webhook_secret_bytes, digestmod="sha256")
+            if value else None
+        )
+
 
 # Global settings instance used throughout the application
 settings = Settings()
\ No newline at end of file
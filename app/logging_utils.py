@@ -13,11 +13,16 @@ Example log output:
 }
 """
 
-import json
+import atexit
+import io
+import queue
 import sys
 import logging
+from logging.handlers import QueueHandler, QueueListener
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+
+import orjson  # Rust-backed JSON serializer - much faster than stdlib json
 
 
 class JSONFormatter(logging.Formatter):
@@ -36,22 +41,69 @@ class JSONFormatter(logging.Formatter):
         Returns:
             JSON string representation of the log record
         """
-        # Format timestamp with milliseconds precision
-        timestamp = datetime.utcnow().isoformat() + "Z"
-        
+        # Timestamp as a datetime object - orjson renders it natively,
+        # avoiding the isoformat() string building per log line. Reuse
+        # the capture time logging already stored on the record instead
+        # of taking another clock reading here (formatting runs later on
+        # the listener thread, so "now" would be wrong anyway).
+        timestamp = datetime.fromtimestamp(record.created, tz=timezone.utc)
+
         # Build base log data with required fields
         log_data = {
-            "ts": timestamp,  # Timestamp in ISO-8601 UTC format
+            "ts": timestamp,  # Timestamp in ISO-8601 UTC format (rendered by orjson)
             "level": record.levelname,  # Log level (INFO, ERROR, WARNING, DEBUG)
             "message": record.getMessage()  # Log message
         }
-        
+
         # Add extra fields if they exist (from request context)
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
-        
+
         # Return as single-line JSON
-        return json.dumps(log_data)
+        # OPT_NAIVE_UTC treats naive datetimes as UTC, OPT_UTC_Z appends 'Z'
+        return orjson.dumps(
+            log_data,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC
+        ).decode()
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that batches writes instead of flushing per record.
+    
+    The stock StreamHandler flushes after every emit, which turns each
+    log line into its own write() syscall. This handler relies on the
+    underlying buffered stream (64 KiB) to coalesce writes, flushing
+    only when the buffer fills, when an ERROR is logged, or at exit.
+    """
+    
+    def flush(self):
+        """Skip the per-record flush - the buffer coalesces writes."""
+        pass
+    
+    def emit(self, record: logging.LogRecord):
+        """Emit the record; flush immediately for ERROR and above.
+        
+        Errors should hit the log stream right away since the process
+        may be about to die.
+        """
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            # Bypass our no-op flush and really flush the stream
+            logging.StreamHandler.flush(self)
+
+
+class PassthroughQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records unformatted.
+    
+    The stock QueueHandler formats each record in prepare() to make it
+    picklable for multiprocess use. We stay in-process, so records can
+    cross the queue as-is - formatting then happens entirely on the
+    listener thread, off the request path.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Pass the record through untouched."""
+        return record
 
 
 class JSONLogger:
@@ -77,14 +129,40 @@ class JSONLogger:
         # Remove existing handlers to avoid duplicates
         self.logger.handlers = []
         
-        # Configure handler to output to stdout
-        handler = logging.StreamHandler(sys.stdout)
+        # Configure handler to output to stdout through a 64 KiB buffer
+        # so log lines are written in batches rather than one syscall each
+        buffered = open(sys.stdout.fileno(), "wb", buffering=65536, closefd=False)
+        self._stream = io.TextIOWrapper(buffered, encoding="utf-8", line_buffering=False)
+        handler = BufferedStreamHandler(self._stream)
+
+        # Make sure buffered lines reach stdout on interpreter shutdown
+        # (the fd may already be gone if something redirected stdout,
+        # e.g. pytest's capture - nothing useful to do about it then)
+        def _flush_on_exit(stream=self._stream):
+            try:
+                stream.flush()
+            except (OSError, ValueError):
+                pass
+        atexit.register(_flush_on_exit)
         
         # Use our custom JSON formatter
         handler.setFormatter(JSONFormatter(datefmt="%Y-%m-%dT%H:%M:%S"))
         
-        # Add handler to logger
-        self.logger.addHandler(handler)
+        # Hand records to a background listener thread via a queue - the
+        # request path only does a queue.put; JSON serialization and the
+        # stream write run on the listener, not in the middleware
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(PassthroughQueueHandler(log_queue))
+        self._listener = QueueListener(log_queue, handler)
+        self._listener.start()
+        
+        # Drain the queue on shutdown so no tail log lines are lost
+        def _stop_listener(listener=self._listener):
+            try:
+                listener.stop()
+            except (OSError, ValueError, RuntimeError):
+                pass
+        atexit.register(_stop_listener)
     
     def _log(self, level: str, data: Dict[str, Any]):
         """Internal method to log data at specified level.
@@ -94,8 +172,10 @@ class JSONLogger:
             data: Dictionary or string to log
         """
         if isinstance(data, dict):
-            # Extract message from data (remove it so it's not duplicated)
-            message = data.pop("message", data.pop("event", ""))
+            # Read the message without mutating the caller's dict - this
+            # lets callers pass their dict straight through with no
+            # defensive copy anywhere on the log path
+            message = data.get("message") or data.get("event", "")
             
             # Create log record
             log_record = self.logger.makeRecord(
@@ -123,7 +203,7 @@ class JSONLogger:
         Args:
             data: Dictionary to log (will be converted to JSON)
         """
-        self._log("INFO", data.copy() if isinstance(data, dict) else data)
+        self._log("INFO", data)
     
     def error(self, data: Dict[str, Any]):
         """Log at ERROR level.
@@ -131,7 +211,7 @@ class JSONLogger:
         Args:
             data: Dictionary to log (will be converted to JSON)
         """
-        self._log("ERROR", data.copy() if isinstance(data, dict) else data)
+        self._log("ERROR", data)
     
     def warning(self, data: Dict[str, Any]):
         """Log at WARNING level.
@@ -139,7 +219,7 @@ class JSONLogger:
         Args:
             data: Dictionary to log (will be converted to JSON)
         """
-        self._log("WARNING", data.copy() if isinstance(data, dict) else data)
+        self._log("WARNING", data)
     
     def debug(self, data: Dict[str, Any]):
         """Log at DEBUG level.
@@ -147,7 +227,7 @@ class JSONLogger:
         Args:
             data: Dictionary to log (will be converted to JSON)
         """
-        self._log("DEBUG", data.copy() if isinstance(data, dict) else data)
+        self._log("DEBUG", data)
 
 
 def setup_logger(level: str = "INFO") -> JSONLogger:
@@ -1,17 +1,17 @@
-# Standard library imports for security, time, and UUID generation
+# Standard library imports for security, time, and request-id generation
+import base64  # Keyset pagination cursor encoding
 import hmac  # HMAC for cryptographic signature verification
-import hashlib  # Hash functions for computing signatures
+import os  # os.urandom for request-id generation
 import time  # Time measurement for latency tracking
-import uuid  # UUID generation for request tracking
-from datetime import datetime  # Timestamp handling
-from typing import Optional  # Type hints for optional values
+from typing import List, Optional  # Type hints for optional values
 from contextlib import asynccontextmanager  # Context manager for lifecycle
+from contextvars import ContextVar  # Per-request log enrichment
 
 # FastAPI framework imports for building REST API
 from fastapi import FastAPI, Request, HTTPException, Query  # Core FastAPI components
-from fastapi.responses import JSONResponse, PlainTextResponse  # Response types
+from fastapi.responses import ORJSONResponse, StreamingResponse  # Response types
 # Pydantic for data validation and serialization
-from pydantic import BaseModel, Field, field_validator  # Data models and validation
+from pydantic import BaseModel, Field, TypeAdapter, field_validator  # Data models and validation
 import uvicorn  # ASGI server for running FastAPI app
 
 # Application-specific imports
@@ -21,10 +21,24 @@ from metrics import MetricsCollector  # Prometheus metrics collection
 from config import settings  # Configuration from environment variables
 from models import WebhookMessage  # Pydantic model for webhook validation
 
+# Compiled validator for webhook payloads, built once at import - calling
+# it directly skips the per-request classmethod dispatch that
+# WebhookMessage.model_validate_json would pay
+_validate_webhook = TypeAdapter(WebhookMessage).validate_json
+_validate_webhook_batch = TypeAdapter(List[WebhookMessage]).validate_json
+
 # Initialize metrics collector and logger for the application
 metrics = MetricsCollector()
 logger = setup_logger()
 
+# Extra log fields set by route handlers (e.g. message_id, result) and
+# picked up by the logging middleware - a ContextVar read is cheaper
+# than probing request.state attributes on every request. The
+# middleware seeds a dict before calling the handler; handlers mutate
+# it in place, because context changes made inside the handler's task
+# don't propagate back to the middleware's context.
+_log_extra: ContextVar[Optional[dict]] = ContextVar("_log_extra", default=None)
+
 # Application lifecycle context manager - handles startup and shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -41,8 +55,10 @@ async def lifespan(app: FastAPI):
     logger.info({"event": "shutdown", "message": "Application shutting down"})
 
 
-# Initialize FastAPI app with lifespan context manager
-app = FastAPI(lifespan=lifespan)
+# Initialize FastAPI app with lifespan context manager. All dict
+# returns render through orjson by default - same serializer the
+# /messages route already uses explicitly.
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 # Initialize database manager with configured database URL
 db_manager = DatabaseManager(settings.database_url)
 
@@ -59,17 +75,24 @@ async def logging_middleware(request: Request, call_next):
     - Log all requests with structured JSON
     """
     # Generate unique ID for tracking this request throughout its lifecycle
-    request_id = str(uuid.uuid4())
+    # 128 random bits as hex - same uniqueness as uuid4 without the
+    # Python-level bitfield assembly and dashed-string formatting
+    request_id = os.urandom(16).hex()
     request.state.request_id = request_id
     
-    # Record start time to calculate latency
-    request.state.start_time = time.time()
+    # Fresh dict for handler-supplied log fields; reset at the end so
+    # nothing leaks into whatever runs next on this context
+    token = _log_extra.set({})
+    
+    # Record start time to calculate latency - perf_counter_ns is
+    # monotonic (immune to NTP clock steps) and returns an int
+    start_ns = time.perf_counter_ns()
     
     # Process the request (call next middleware/route handler)
     response = await call_next(request)
     
-    # Calculate request latency in milliseconds
-    latency_ms = (time.time() - request.state.start_time) * 1000
+    # Calculate request latency in milliseconds - one division at the end
+    latency_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
     
     # Record metrics for monitoring and observability
     metrics.record_request(
@@ -80,8 +103,9 @@ async def logging_middleware(request: Request, call_next):
     )
     
     # Build structured log data with request and response information
+    # No "ts" here - the log formatter owns the timestamp, taken from
+    # the record's own capture time
     log_data = {
-        "ts": datetime.utcnow().isoformat() + "Z",
         "level": "INFO",
         "request_id": request_id,
         "method": request.method,
@@ -91,8 +115,10 @@ async def logging_middleware(request: Request, call_next):
     }
     
     # Add any extra fields from the route (e.g., message_id, result)
-    if hasattr(request.state, "log_extra"):
-        log_data.update(request.state.log_extra)
+    extra = _log_extra.get()
+    if extra:
+        log_data.update(extra)
+    _log_extra.reset(token)
     
     logger.info(log_data)
     
@@ -100,7 +126,7 @@ async def logging_middleware(request: Request, call_next):
 
 
 # Verify webhook signature using HMAC-SHA256 for security
-def verify_signature(body: bytes, signature: str) -> bool:
+def verify_signature(hasher: Optional[hmac.HMAC], signature: str) -> bool:
     """Verify that the webhook request is from a trusted source.
     
     Uses HMAC-SHA256 with a shared secret key. This ensures:
@@ -111,27 +137,20 @@ def verify_signature(body: bytes, signature: str) -> bool:
     where an attacker could guess the signature by measuring response time.
     
     Args:
-        body: Raw request body bytes (not decoded JSON)
+        hasher: HMAC object already fed the raw body bytes while streaming
+                (None when the webhook secret is not configured)
         signature: Hex string signature from X-Signature header
         
     Returns:
         True if signature is valid, False otherwise
     """
     # Return False if webhook secret is not configured
-    if not settings.webhook_secret:
+    if hasher is None:
         return False
     
-    # Generate expected signature from webhook secret and request body
-    # Must compute from raw bytes to match what client sent
-    expected = hmac.new(
-        settings.webhook_secret.encode(),  # Convert secret string to bytes
-        body,  # Raw request body bytes
-        hashlib.sha256  # Use SHA256 hash algorithm
-    ).hexdigest()  # Convert to hex string for comparison
-    
     # Compare signatures using constant-time comparison to prevent timing attacks
     # This prevents attackers from using timing information to guess the signature
-    return hmac.compare_digest(expected, signature)
+    return hmac.compare_digest(hasher.hexdigest(), signature)
 
 
 # Webhook endpoint to receive and process incoming messages
@@ -140,7 +159,7 @@ async def webhook(request: Request):
     """Process incoming webhook message with signature verification.
     
     Flow:
-    1. Read raw request body
+    1. Stream raw request body, hashing chunks as they arrive
     2. Verify HMAC signature for authenticity
     3. Parse and validate message JSON
     4. Check for duplicates (idempotency)
@@ -152,17 +171,35 @@ async def webhook(request: Request):
         401 if signature invalid
         422 if message validation failed
     """
-    # Read the raw request body (needed for signature verification)
-    body = await request.body()
-    
     # Extract signature from X-Signature header
     signature = request.headers.get("X-Signature", "")
     
+    # Stream the request body, feeding the HMAC chunk by chunk so the
+    # bytes are hashed while still hot in CPU cache - one pass for the
+    # hash and one for the JSON parse, instead of hashing a fully
+    # buffered body in a separate pass.
+    # Only key an HMAC when the secret is configured and the header is
+    # even plausibly a SHA-256 hex digest (exactly 64 chars) - scanners
+    # and broken clients then cost no hashing at all. The expected
+    # length is public, so the early reject leaks nothing. Copying the
+    # pre-keyed context skips hmac.new's key-setup hashing per request.
+    hasher = None
+    if settings.webhook_hmac is not None and len(signature) == 64:
+        hasher = settings.webhook_hmac.copy()
+    chunks = []
+    async for chunk in request.stream():
+        if hasher is not None:
+            hasher.update(chunk)
+        chunks.append(chunk)
+    
+    # Reassemble the body for JSON parsing below
+    body = b"".join(chunks)
+    
     # Verify webhook signature for security
-    if not verify_signature(body, signature):
+    if not verify_signature(hasher, signature):
         # Invalid signature - reject this request as unauthorized
         metrics.record_webhook("invalid_signature")
-        request.state.log_extra = {"result": "invalid_signature"}
+        _log_extra.get().update(result="invalid_signature")
         logger.error({
             "event": "invalid_signature",
             "request_id": request.state.request_id
@@ -172,49 +209,121 @@ async def webhook(request: Request):
     
     # Parse and validate the webhook message using Pydantic
     try:
-        message = WebhookMessage.model_validate_json(body)
+        message = _validate_webhook(body)
     except Exception as e:
         # Validation error - message format is incorrect
         metrics.record_webhook("validation_error")
-        request.state.log_extra = {"result": "validation_error"}
+        _log_extra.get().update(result="validation_error")
         # Return 422 Unprocessable Entity
         raise HTTPException(status_code=422, detail=str(e))
     
-    # Check if message already exists (duplicate detection for idempotency)
-    # Allows clients to safely retry failed requests
-    is_duplicate = db_manager.message_exists(message.message_id)
-    
-    # Only insert message if it's not a duplicate
-    if not is_duplicate:
-        # Insert new message into database
-        db_manager.insert_message(
-            message_id=message.message_id,
-            from_msisdn=message.from_,  # Note: message.from_ maps to JSON "from"
-            to_msisdn=message.to,
-            ts=message.ts,
-            text=message.text
-        )
+    # Insert the message - a single INSERT OR IGNORE both stores the
+    # row and detects duplicates, replacing the old exists-then-insert
+    # pair of statements. Clients can safely retry failed requests.
+    created = db_manager.insert_message(
+        message_id=message.message_id,
+        from_msisdn=message.from_,  # Note: message.from_ maps to JSON "from"
+        to_msisdn=message.to,
+        ts=message.ts,
+        text=message.text
+    )
+    is_duplicate = not created
+    
+    if created:
         # Record metric: message was successfully created
         metrics.record_webhook("created")
         result = "created"
     else:
-        # Duplicate message - don't insert but still return success
+        # Duplicate message - not re-inserted but still a success
         # This allows clients to retry without seeing errors
         metrics.record_webhook("duplicate")
         result = "duplicate"
     
     # Add result information to the log
-    request.state.log_extra = {
-        "message_id": message.message_id,
-        "dup": is_duplicate,  # Boolean: was this a duplicate?
-        "result": result  # String: created or duplicate
-    }
+    _log_extra.get().update(
+        message_id=message.message_id,
+        dup=is_duplicate,  # Boolean: was this a duplicate?
+        result=result  # String: created or duplicate
+    )
     
     # Always return 200 OK for idempotency
     # Clients can safely retry the same request multiple times
     return {"status": "ok"}
 
 
+# Batch ingestion - one transaction for a whole array of messages
+@app.post("/webhook/batch")
+async def webhook_batch(request: Request):
+    """Ingest a JSON array of webhook messages in one request.
+    
+    Same signature scheme as /webhook (HMAC over the raw body), but the
+    whole array is validated in one pass and inserted in a single
+    transaction - one fsync per batch instead of per message. Intended
+    for bursty senders and backfills.
+    
+    Returns:
+        200 OK with counts of inserted and duplicate messages
+        401 if signature invalid
+        422 if the payload is not a valid message array
+    """
+    # Extract signature from X-Signature header
+    signature = request.headers.get("X-Signature", "")
+    
+    # Stream and hash the body exactly like the single-message path
+    hasher = None
+    if settings.webhook_hmac is not None and len(signature) == 64:
+        hasher = settings.webhook_hmac.copy()
+    chunks = []
+    async for chunk in request.stream():
+        if hasher is not None:
+            hasher.update(chunk)
+        chunks.append(chunk)
+    body = b"".join(chunks)
+    
+    # Verify webhook signature for security
+    if not verify_signature(hasher, signature):
+        metrics.record_webhook("invalid_signature")
+        _log_extra.get().update(result="invalid_signature")
+        logger.error({
+            "event": "invalid_signature",
+            "request_id": request.state.request_id
+        })
+        raise HTTPException(status_code=401, detail="invalid signature")
+    
+    # Validate the whole array in one pydantic-core pass
+    try:
+        messages = _validate_webhook_batch(body)
+    except Exception as e:
+        metrics.record_webhook("validation_error")
+        _log_extra.get().update(result="validation_error")
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # One transaction for the whole batch; duplicates are ignored by
+    # the INSERT OR IGNORE, so retrying a batch is safe
+    inserted = db_manager.insert_messages_bulk([
+        (m.message_id, m.from_, m.to, m.ts, m.text)
+        for m in messages
+    ])
+    duplicates = len(messages) - inserted
+    
+    # One counter bump per outcome, not per message - a 10k-row batch
+    # shouldn't cost 10k metric calls. All-zero outcomes stay
+    # unrecorded so no zero-count label appears in the export.
+    if inserted:
+        metrics.record_webhook("created", count=inserted)
+    if duplicates:
+        metrics.record_webhook("duplicate", count=duplicates)
+    
+    _log_extra.get().update(
+        batch_size=len(messages),
+        inserted=inserted,
+        duplicates=duplicates,
+        result="batch_ok"
+    )
+    
+    return {"status": "ok", "inserted": inserted, "duplicates": duplicates}
+
+
 # Retrieve messages with optional filtering and pagination
 @app.get("/messages")
 async def get_messages(
@@ -227,7 +336,14 @@ async def get_messages(
     # Filter messages since this timestamp (optional, ISO-8601 format)
     since: Optional[str] = None,
     # Full-text search in message text (optional)
-    q: Optional[str] = None
+    q: Optional[str] = None,
+    # Keyset pagination cursor: ts + message_id of the last row seen
+    # (preferred over offset for deep pages - stays O(limit))
+    after_ts: Optional[str] = None,
+    after_id: Optional[str] = None,
+    # Compute the total matching count (costs a scan on filtered
+    # queries; omit it when the UI doesn't need it)
+    include_total: bool = False
 ):
     """Retrieve messages with pagination and optional filtering.
     
@@ -236,30 +352,55 @@ async def get_messages(
     - since: timestamp (returns messages >= this time)
     - q: full-text search in message content
     
-    Always returns:
+    Returns:
     - data: array of messages
-    - total: count of ALL messages matching filters (not just returned)
+    - total: count of ALL messages matching filters, when
+      ?include_total=1 is passed; null otherwise (counting scans the
+      whole matching set, so it's opt-in)
     - limit: the limit parameter used
     - offset: the offset parameter used
+    - next_cursor: opaque cursor for the next page (base64 "ts|id"),
+      present when this page was full; decode and pass the two parts
+      as after_ts/after_id to continue without OFFSET cost
     
     This allows pagination UI to know total available results.
     """
     # Fetch messages from database with applied filters
-    messages, total = db_manager.get_messages(
-        limit=limit,
-        offset=offset,
-        from_filter=from_,
-        since=since,
-        text_search=q
-    )
-    
-    # Return paginated results with total count
-    return {
+    try:
+        messages, total = db_manager.get_messages(
+            limit=limit,
+            offset=offset,
+            from_filter=from_,
+            since=since,
+            text_search=q,
+            after_ts=after_ts,
+            after_id=after_id,
+            include_total=include_total
+        )
+    except ValueError:
+        # since/after_ts wasn't a valid ISO-8601 timestamp
+        raise HTTPException(status_code=422, detail="invalid timestamp parameter")
+    
+    # Hand the client a cursor for the next page when this one was full
+    next_cursor = None
+    if messages and len(messages) == limit:
+        last = messages[-1]
+        next_cursor = base64.urlsafe_b64encode(
+            f"{last['ts']}|{last['message_id']}".encode()
+        ).decode()
+    
+    # Return paginated results with total count. Serialized straight
+    # through orjson - the rows are plain dicts we just built, so
+    # there's nothing for a response model to validate, and skipping
+    # the per-row Pydantic construction + model_dump round trip keeps
+    # list responses cheap.
+    return ORJSONResponse({
         "data": messages,
-        "total": total,  # Total matching filters, not just returned count
+        "total": total,  # Total matching filters (None unless include_total)
         "limit": limit,
-        "offset": offset
-    }
+        "offset": offset,
+        "next_cursor": next_cursor
+    })
 
 
 # Retrieve statistics about stored messages
@@ -319,7 +460,7 @@ async def health_ready():
 
 
 # Export metrics in Prometheus format for monitoring
-@app.get("/metrics", response_class=PlainTextResponse)
+@app.get("/metrics")
 async def get_metrics():
     """Export collected metrics in Prometheus text format.
     
@@ -333,8 +474,11 @@ async def get_metrics():
     Prometheus scrapes this endpoint periodically (e.g., every 15 seconds)
     and stores the time series data for monitoring and alerting.
     """
-    # Export collected metrics in text format
-    return metrics.export()
+    # Stream the export chunk by chunk - the full text never has to
+    # materialize in memory, and chunks are already ASCII bytes.
+    # Starlette appends "; charset=utf-8" to any text/* media type
+    # itself, so passing charset here would emit it twice.
+    return StreamingResponse(metrics.export(), media_type="text/plain; version=0.0.4")
 
 
 # Run the application with Uvicorn server
@@ -11,31 +11,54 @@ Collected metrics:
 These metrics can be scraped by Prometheus for alerting and dashboards.
 """
 
+from array import array
+from bisect import bisect_left
 from collections import defaultdict
 from threading import Lock
-from typing import Dict, List
+from typing import Dict, Iterator, List
+
+
+# Static Prometheus header blocks - formatted once at import, not per scrape
+_HTTP_REQUESTS_HEADER = (
+    "# HELP http_requests_total Total HTTP requests",
+    "# TYPE http_requests_total counter",
+)
+_WEBHOOK_REQUESTS_HEADER = (
+    "# HELP webhook_requests_total Total webhook processing outcomes",
+    "# TYPE webhook_requests_total counter",
+)
+_LATENCY_HEADER = (
+    "# HELP request_latency_ms Request latency in milliseconds",
+    "# TYPE request_latency_ms histogram",
+)
 
 
 class MetricsCollector:
-    """Thread-safe metrics collector for application monitoring.
-    
+    """Metrics collector for application monitoring.
+
     Collects three types of metrics:
     - Counters: Track cumulative values
     - Histograms: Track distribution of values (latency)
-    
-    All methods are thread-safe using locks for concurrent access.
+
+    Single-writer by design: the record methods are only ever called
+    from the event-loop thread (middleware and route handlers), so they
+    don't lock. The lock exists to serialize exports against each other
+    and is not what makes recording safe - do not reuse this pattern
+    where multiple threads record.
     """
-    
+
     def __init__(self):
         """Initialize metrics collector with empty metrics."""
-        # Lock for thread-safe access to metrics
+        # Held only while exporting - recording is safe without it
+        # because all recorders run on the one event-loop thread
         self.lock = Lock()
         
-        # Counter: {path,status} -> count
-        # Example: path="/webhook",status="200" -> 10
+        # Counter: (path, status) -> count
+        # Keyed by raw tuple - cheap to hash; the Prometheus label string
+        # is only built at export time, not per request
         self.http_requests = defaultdict(int)
         
-        # Counter: {result} -> count
+        # Counter: result -> count
         # Results can be: created, duplicate, invalid_signature, validation_error
         self.webhook_results = defaultdict(int)
         
@@ -43,8 +66,18 @@ class MetricsCollector:
         # Buckets help understand latency distribution
         self.latency_buckets = [100, 500, 1000, 5000, float('inf')]
         
-        # Histogram: bucket size -> count of requests in that bucket
-        self.latency_counts = defaultdict(int)
+        # Histogram: bucket position -> count of requests whose latency
+        # falls in that bucket (non-cumulative; cumulated at export time).
+        # Fixed-size array of unsigned 64-bit counters - cheaper to
+        # index than a dict
+        self.latency_counts = array('Q', [0] * len(self.latency_buckets))
+        
+        # Bucket label strings ("100", ..., "+Inf") precomputed once -
+        # the int/str formatting should not run on every scrape
+        self.bucket_labels = [
+            "+Inf" if bucket == float('inf') else str(int(bucket))
+            for bucket in self.latency_buckets
+        ]
         
         # Sum and count for computing average latency
         self.latency_sum = 0
@@ -63,97 +96,92 @@ class MetricsCollector:
             status: HTTP response status code (200, 401, 422, etc.)
             latency_ms: Request latency in milliseconds
         """
-        with self.lock:
-            # Build labels string for Prometheus format
-            # Example: path="/webhook",status="200"
-            key = f'path="{path}",status="{status}"'
-            
-            # Increment counter for this endpoint and status
-            self.http_requests[key] += 1
-            
-            # Record latency in histogram buckets
-            # Count how many requests fall into each latency bucket
-            for bucket in self.latency_buckets:
-                if latency_ms <= bucket:
-                    self.latency_counts[bucket] += 1
-            
-            # Track sum and count for average calculation
-            self.latency_sum += latency_ms
-            self.latency_count += 1
-    
-    def record_webhook(self, result: str):
-        """Record webhook processing outcome.
+        # No lock here - these increments are read-modify-write and NOT
+        # atomic; this is only safe because every call comes from the
+        # single event-loop thread, and an await can't land mid-
+        # increment. A second writer thread would lose updates.
+        # Increment counter for this endpoint and status - no string
+        # formatting on the request path, the tuple is the key
+        self.http_requests[(path, status)] += 1
         
+        # Record latency in its histogram bucket - O(log B) bisect picks
+        # the single owning bucket; counts are stored non-cumulative and
+        # summed into Prometheus cumulative form at export time
+        idx = bisect_left(self.latency_buckets, latency_ms)
+        self.latency_counts[idx] += 1
+        
+        # Track sum and count for average calculation
+        self.latency_sum += latency_ms
+        self.latency_count += 1
+    
+    def record_webhook(self, result: str, count: int = 1):
+        """Record webhook processing outcomes.
+
         Called after processing each webhook request to track:
         - How many messages were created
         - How many were duplicates
         - How many had errors
-        
+
         Args:
             result: Outcome of webhook processing
                    Can be: 'created', 'duplicate', 'invalid_signature', 'validation_error'
+            count: How many messages had this outcome - batch endpoints
+                   record a whole batch in one call instead of once per
+                   message
         """
-        with self.lock:
-            # Build labels string for Prometheus format
-            # Example: result="created"
-            key = f'result="{result}"'
-            
-            # Increment counter for this result type
-            self.webhook_results[key] += 1
+        # Lock-free for the same reason as record_request - single
+        # writer thread, not atomicity; the result string itself is the
+        # key, formatted only at export time
+        self.webhook_results[result] += count
     
-    def export(self) -> str:
+    def export(self) -> Iterator[bytes]:
         """Export all metrics in Prometheus text format.
         
         This format can be scraped by Prometheus monitoring system.
         Each metric has HELP and TYPE lines followed by data lines.
         
-        Returns:
-            String with all metrics in Prometheus format
+        Yields one ASCII bytes chunk per metric family, so the full
+        export text never has to materialize in memory - the response
+        layer streams the chunks out as they are produced.
         """
+        # Snapshot the counters under the lock, then do all string
+        # formatting outside it - building the text is the bulk of the
+        # work here and would otherwise block recorders during a scrape
         with self.lock:
-            lines = []
-            
-            # === HTTP REQUESTS COUNTER ===
-            # HELP and TYPE lines are required by Prometheus format
-            lines.append("# HELP http_requests_total Total HTTP requests")
-            lines.append("# TYPE http_requests_total counter")
-            
-            # Export each path/status combination with its count
-            # Sorted for consistent output
-            for labels, count in sorted(self.http_requests.items()):
-                lines.append(f"http_requests_total{{{labels}}} {count}")
-            
-            # === WEBHOOK RESULTS COUNTER ===
-            lines.append("# HELP webhook_requests_total Total webhook processing outcomes")
-            lines.append("# TYPE webhook_requests_total counter")
-            
-            # Export each result type with its count
-            for labels, count in sorted(self.webhook_results.items()):
-                lines.append(f"webhook_requests_total{{{labels}}} {count}")
-            
-            # === REQUEST LATENCY HISTOGRAM ===
-            lines.append("# HELP request_latency_ms Request latency in milliseconds")
-            lines.append("# TYPE request_latency_ms histogram")
-            
-            # Export latency buckets
-            # Histogram shows how many requests had latency <= each bucket
-            cumulative = 0
-            for bucket in self.latency_buckets:
-                # Add all requests in this bucket and previous buckets
-                cumulative += self.latency_counts[bucket]
-                
-                # Format bucket label ("+Inf" for infinity bucket)
-                bucket_label = "+Inf" if bucket == float('inf') else str(int(bucket))
-                
-                # Export cumulative count for this bucket
-                lines.append(f'request_latency_ms_bucket{{le="{bucket_label}"}} {cumulative}')
-            
-            # Export sum and count for average calculation
-            lines.append(f"request_latency_ms_sum {self.latency_sum}")
-            lines.append(f"request_latency_ms_count {self.latency_count}")
-            
-            # Join all lines and add final newline
-            return "\n".join(lines) + "\n"
-            lines.append(f"request_latency_ms_count {self.latency_count}")
-            
-            return "\n".join(lines) + "\n"
\ No newline at end of file
+            http_requests = sorted(self.http_requests.items())
+            webhook_results = sorted(self.webhook_results.items())
+            latency_counts = list(self.latency_counts)
+            latency_sum = self.latency_sum
+            latency_count = self.latency_count
+        
+        # === HTTP REQUESTS COUNTER ===
+        # Static HELP/TYPE headers plus one bulk comprehension per counter
+        # family - fewer interpreter round trips than per-line appends
+        lines = list(_HTTP_REQUESTS_HEADER)
+        lines += [
+            'http_requests_total{path="%s",status="%d"} %d' % (path, status, count)
+            for (path, status), count in http_requests
+        ]
+        yield ("\n".join(lines) + "\n").encode("ascii")
+        
+        # === WEBHOOK RESULTS COUNTER ===
+        lines = list(_WEBHOOK_REQUESTS_HEADER)
+        lines += [
+            'webhook_requests_total{result="%s"} %d' % (result, count)
+            for result, count in webhook_results
+        ]
+        yield ("\n".join(lines) + "\n").encode("ascii")
+        
+        # === REQUEST LATENCY HISTOGRAM ===
+        # Histogram shows how many requests had latency <= each bucket;
+        # bucket labels were precomputed in __init__
+        lines = list(_LATENCY_HEADER)
+        cumulative = 0
+        for label, count in zip(self.bucket_labels, latency_counts):
+            cumulative += count
+            lines.append('request_latency_ms_bucket{le="%s"} %d' % (label, cumulative))
+        
+        # Export sum and count for average calculation
+        lines.append("request_latency_ms_sum %s" % latency_sum)
+        lines.append("request_latency_ms_count %d" % latency_count)
+        yield ("\n".join(lines) + "\n").encode("ascii")
@@ -13,11 +13,176 @@ The database uses SQLite for simplicity and has been designed for:
 """
 
 import sqlite3
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 
 
+def _iso_to_epoch_us(ts: str) -> int:
+    """Convert an ISO-8601 UTC timestamp ("...Z") to epoch microseconds.
+    
+    Timestamps are stored as INTEGER so index probes and ORDER BY are
+    8-byte integer compares instead of text collation, and index pages
+    stay small.
+    
+    Args:
+        ts: ISO-8601 UTC timestamp string ending in 'Z'
+        
+    Returns:
+        Microseconds since the Unix epoch
+        
+    Raises:
+        ValueError: If the string is not a valid ISO-8601 timestamp
+    """
+    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return int(dt.timestamp()) * 1_000_000 + dt.microsecond
+
+
+def _epoch_us_to_iso(value: Optional[int]) -> Optional[str]:
+    """Convert epoch microseconds back to the API's ISO-8601 UTC form.
+    
+    Args:
+        value: Microseconds since the Unix epoch, or None
+        
+    Returns:
+        ISO-8601 UTC string ending in 'Z', or None if value was None
+    """
+    if value is None:
+        return None
+    secs, us = divmod(value, 1_000_000)
+    dt = datetime.fromtimestamp(secs, tz=timezone.utc).replace(microsecond=us)
+    return dt.replace(tzinfo=None).isoformat() + "Z"
+
+
+# Hot SQL statements as module-level constants. Reusing the exact same
+# string objects on every call keeps sqlite3's per-connection statement
+# cache effective - the parse/plan step runs once, not per request.
+_INSERT_SQL = """
+    INSERT OR IGNORE INTO messages (message_id, from_msisdn, to_msisdn, ts, text, created_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Stats are served from trigger-maintained aggregate tables, so none
+# of these touch the messages table at all
+_STATS_META_SQL = "SELECT message_count, first_ts, last_ts FROM meta WHERE id = 1"
+_STATS_SENDERS_SQL = "SELECT COUNT(*) FROM sender_counts"
+_STATS_TOP_SENDERS_SQL = """
+    SELECT from_msisdn, count
+    FROM sender_counts
+    ORDER BY count DESC
+    LIMIT 10
+"""
+
+
+def _build_messages_queries() -> Dict[Tuple[bool, bool, bool, bool], Tuple[str, str, str]]:
+    """Prebuild the possible get_messages query shapes at import.
+    
+    The WHERE clause depends only on which of the three filters are
+    present (2x2x2 combinations), so the SQL strings can be assembled
+    once here instead of f-string-rebuilt on every request - which also
+    gives the statement cache stable strings to key on. Each shape gets
+    both an OFFSET variant and a keyset ("seek") variant; the count
+    query ignores pagination either way.
+    
+    Text-filtered shapes come in two flavors: an FTS5 MATCH join that
+    walks the inverted index (O(matching docs)), and a LIKE scan kept
+    as the fallback for SQLite builds without FTS5.
+    
+    Returns:
+        Dict keyed by (has_from, has_since, has_text, use_fts)
+        booleans, mapping to a (count_query, offset_data_query,
+        keyset_data_query) triple
+    """
+    queries = {}
+    for has_from in (False, True):
+        for has_since in (False, True):
+            for has_text in (False, True):
+                for use_fts in (False, True):
+                    clauses = []
+                    if has_from:
+                        clauses.append("from_msisdn = ?")
+                    if has_since:
+                        clauses.append("ts >= ?")
+                    if has_text:
+                        if use_fts:
+                            clauses.append("messages_fts MATCH ?")
+                        else:
+                            clauses.append("text LIKE ?")
+                    where_sql = " AND ".join(clauses) if clauses else "1=1"
+                    
+                    if has_text and use_fts:
+                        # Join back from the FTS posting list to the
+                        # message rows by rowid
+                        from_sql = "messages JOIN messages_fts ON messages_fts.rowid = messages.rowid"
+                        columns = ("messages.message_id, messages.from_msisdn, "
+                                   "messages.to_msisdn, messages.ts, messages.text")
+                    else:
+                        from_sql = "messages"
+                        columns = "message_id, from_msisdn, to_msisdn, ts, text"
+                    
+                    count_query = f"SELECT COUNT(*) FROM {from_sql} WHERE {where_sql}"
+                    data_query = f"""
+                        SELECT {columns}
+                        FROM {from_sql}
+                        WHERE {where_sql}
+                        ORDER BY messages.ts ASC, messages.message_id ASC
+                        LIMIT ? OFFSET ?
+                    """ if (has_text and use_fts) else f"""
+                        SELECT {columns}
+                        FROM {from_sql}
+                        WHERE {where_sql}
+                        ORDER BY ts ASC, message_id ASC
+                        LIMIT ? OFFSET ?
+                    """
+                    # Keyset variant: the row-value comparison seeks straight
+                    # to the cursor position in the (ts, message_id) index -
+                    # O(limit) regardless of how deep the page is
+                    keyset_query = f"""
+                        SELECT {columns}
+                        FROM {from_sql}
+                        WHERE {where_sql} AND (messages.ts, messages.message_id) > (?, ?)
+                        ORDER BY messages.ts ASC, messages.message_id ASC
+                        LIMIT ?
+                    """ if (has_text and use_fts) else f"""
+                        SELECT {columns}
+                        FROM {from_sql}
+                        WHERE {where_sql} AND (ts, message_id) > (?, ?)
+                        ORDER BY ts ASC, message_id ASC
+                        LIMIT ?
+                    """
+                    queries[(has_from, has_since, has_text, use_fts)] = (
+                        count_query, data_query, keyset_query
+                    )
+    return queries
+
+
+_MESSAGES_QUERIES = _build_messages_queries()
+
+
+# Response dict keys for get_messages rows, hoisted so the per-row
+# dict build reuses the same pre-hashed key objects instead of
+# re-creating literal strings inside the comprehension. Order matches
+# the SELECT column list.
+_ROW_KEYS = ("message_id", "from", "to", "ts", "text")
+
+
+def _fts_phrase(term: str) -> str:
+    """Quote a user search term as a single FTS5 phrase.
+    
+    FTS5 treats bare input as query syntax (AND/OR/NEAR, column
+    filters); wrapping the term in double quotes makes it a literal
+    phrase so user input can't break the query.
+    
+    Args:
+        term: Raw user search term
+        
+    Returns:
+        The term as a quoted FTS5 phrase string
+    """
+    return '"' + term.replace('"', '""') + '"' 
+
+
 class DatabaseManager:
     """Manages SQLite database operations for webhook messages.
     
@@ -35,24 +200,38 @@ class DatabaseManager:
         # Example: sqlite:////data/app.db -> /data/app.db
         self.db_path = database_url.replace("sqlite:///", "")
         
+        # Single long-lived connection, opened lazily on first use so
+        # config (and tests) can still repoint db_path before anything
+        # touches the database. Guarded by an RLock for cross-thread use.
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Set by init_db once we know whether this SQLite build has
+        # FTS5; text search falls back to LIKE when it doesn't
+        self._fts_enabled = False
+        
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a SQLite connection and configure it.
+        """Get the shared SQLite connection, opening it on first use.
         
-        Creates parent directories if needed and sets row factory
-        to return rows as dictionaries.
+        Opening a connection per call paid connection setup, a stat()
+        for the mkdir, and page-cache warm-up on every request; the
+        persistent connection pays all of that exactly once.
         
         Returns:
-            Configured SQLite connection object
+            Configured SQLite connection object (do not close it)
         """
-        # Create directory structure if it doesn't exist
-        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-        
-        # Connect to database
-        conn = sqlite3.connect(self.db_path)
-        
-        # Return rows as dictionaries instead of tuples for easier access
-        conn.row_factory = sqlite3.Row
-        return conn
+        if self._conn is None:
+            # Create directory structure if it doesn't exist (once)
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            
+            # Connect to database - autocommit mode, shared across the
+            # worker threads TestClient and the server may use
+            self._conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=256
+            )
+        return self._conn
     
     def init_db(self):
         """Initialize database schema.
@@ -60,38 +239,183 @@ class DatabaseManager:
         Creates the messages table and indexes if they don't exist.
         This is called once at application startup.
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Create messages table with all required fields
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS messages (
-                message_id TEXT PRIMARY KEY,
-                from_msisdn TEXT NOT NULL,
-                to_msisdn TEXT NOT NULL,
-                ts TEXT NOT NULL,
-                text TEXT,
-                created_at TEXT NOT NULL
-            )
-        """)
-        
-        # Create index on sender phone number for fast filtering
-        # This speeds up queries like "GET /messages?from=+919876543210"
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_from_msisdn 
-            ON messages(from_msisdn)
-        """)
-        
-        # Create index on timestamp for fast sorting and filtering
-        # This speeds up queries like "GET /messages?since=2025-01-15T10:00:00Z"
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_ts 
-            ON messages(ts)
-        """)
-        
-        # Commit the schema changes
-        conn.commit()
-        conn.close()
+        with self._lock:
+            conn = self._get_connection()
+
+            # Tune SQLite for a write-heavy webhook workload. WAL avoids
+            # the double fsync of the default rollback journal and lets
+            # readers run during writes; NORMAL sync is durable enough
+            # under WAL (a crash loses at most the last transactions,
+            # never corrupts). Larger cache and mmap keep hot pages in
+            # memory; busy_timeout stops writers failing fast on lock.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA busy_timeout=5000")
+
+            # Create messages table with all required fields
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    message_id TEXT PRIMARY KEY,
+                    from_msisdn TEXT NOT NULL,
+                    to_msisdn TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    text TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            
+            # Create index on sender phone number for fast filtering
+            # This speeds up queries like "GET /messages?from=+919876543210"
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_from_msisdn 
+                ON messages(from_msisdn)
+            """)
+            
+            # Composite index matching the list query's ORDER BY ts,
+            # message_id - lets SQLite satisfy ordering straight off the
+            # index (no temp B-tree sort), turning LIMIT/OFFSET into a
+            # bounded index scan. Also covers plain since-filters.
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ts_msgid 
+                ON messages(ts, message_id)
+            """)
+            
+            # Composite index for the common from=... plus ORDER BY ts
+            # combination - sender-filtered pages walk this index in
+            # order instead of sorting
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_from_ts 
+                ON messages(from_msisdn, ts)
+            """)
+            
+            # Partial variant for sender queries that also filter on
+            # text: rows with NULL text can never satisfy a LIKE, so
+            # the predicate keeps those rows out of the B-tree entirely
+            # - a narrower, hotter index (LIKE implies text IS NOT
+            # NULL, which is what lets the planner pick it). Only the
+            # non-FTS fallback path benefits; with FTS5 available, text
+            # search goes through the inverted index instead.
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_from_ts_with_text 
+                ON messages(from_msisdn, ts) WHERE text IS NOT NULL
+            """)
+            
+            # Single-row meta table holding trigger-maintained global
+            # aggregates: total count plus first/last message timestamp.
+            # /messages totals and most of /stats become 1-row lookups
+            # instead of scans over the messages table.
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    message_count INTEGER NOT NULL,
+                    first_ts INTEGER,
+                    last_ts INTEGER
+                )
+            """)
+            
+            # Per-sender counts, also trigger-maintained - the /stats
+            # top-senders list and distinct-sender count read this tiny
+            # table instead of GROUP BY-ing the whole messages table
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sender_counts (
+                    from_msisdn TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                )
+            """)
+            
+            # Seed both from the live data (no-ops if rows exist)
+            conn.execute("""
+                INSERT OR IGNORE INTO meta (id, message_count, first_ts, last_ts)
+                SELECT 1, COUNT(*), MIN(ts), MAX(ts) FROM messages
+            """)
+            conn.execute("""
+                INSERT OR IGNORE INTO sender_counts (from_msisdn, count)
+                SELECT from_msisdn, COUNT(*) FROM messages GROUP BY from_msisdn
+            """)
+            
+            # Superseded by the messages_stats_* triggers below
+            conn.execute("DROP TRIGGER IF EXISTS messages_count_inc")
+            conn.execute("DROP TRIGGER IF EXISTS messages_count_dec")
+            
+            # Keep the aggregates in lockstep with inserts: bump the
+            # sender's count (upsert) and fold the new row into the
+            # global count and timestamp range
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS messages_stats_inc
+                AFTER INSERT ON messages BEGIN
+                    INSERT INTO sender_counts (from_msisdn, count)
+                    VALUES (NEW.from_msisdn, 1)
+                    ON CONFLICT(from_msisdn) DO UPDATE SET count = count + 1;
+                    UPDATE meta SET
+                        message_count = message_count + 1,
+                        first_ts = min(coalesce(first_ts, NEW.ts), NEW.ts),
+                        last_ts = max(coalesce(last_ts, NEW.ts), NEW.ts)
+                    WHERE id = 1;
+                END
+            """)
+            
+            # Deletes are rare (tests, retention jobs), so the only
+            # non-O(1) work - recomputing the timestamp range - runs
+            # just when a boundary row was removed, via an index seek
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS messages_stats_dec
+                AFTER DELETE ON messages BEGIN
+                    UPDATE sender_counts SET count = count - 1
+                    WHERE from_msisdn = OLD.from_msisdn;
+                    DELETE FROM sender_counts
+                    WHERE from_msisdn = OLD.from_msisdn AND count = 0;
+                    UPDATE meta SET
+                        message_count = message_count - 1,
+                        first_ts = (SELECT MIN(ts) FROM messages),
+                        last_ts = (SELECT MAX(ts) FROM messages)
+                    WHERE id = 1;
+                END
+            """)
+            
+            # Full-text index over message text. The external-content
+            # form stores only the inverted index and reads row text
+            # from messages by rowid, so nothing is duplicated. Not
+            # every SQLite build ships FTS5 - on those, text search
+            # stays on the LIKE scan.
+            try:
+                fts_existed = conn.execute("""
+                    SELECT 1 FROM sqlite_master
+                    WHERE type = 'table' AND name = 'messages_fts'
+                """).fetchone() is not None
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts
+                    USING fts5(text, content='messages', content_rowid='rowid')
+                """)
+                if not fts_existed:
+                    # Index whatever rows predate the FTS table
+                    conn.execute(
+                        "INSERT INTO messages_fts(messages_fts) VALUES('rebuild')"
+                    )
+                
+                # Keep the inverted index in sync with the content
+                # table ('delete' is FTS5's external-content removal
+                # command - it needs the old text to unindex it)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_ins
+                    AFTER INSERT ON messages BEGIN
+                        INSERT INTO messages_fts (rowid, text)
+                        VALUES (NEW.rowid, NEW.text);
+                    END
+                """)
+                conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS messages_fts_del
+                    AFTER DELETE ON messages BEGIN
+                        INSERT INTO messages_fts (messages_fts, rowid, text)
+                        VALUES ('delete', OLD.rowid, OLD.text);
+                    END
+                """)
+                self._fts_enabled = True
+            except sqlite3.OperationalError:
+                # FTS5 not compiled in - LIKE fallback stays in effect
+                self._fts_enabled = False
     
     def check_db_ready(self) -> bool:
         """Check if database is initialized and ready.
@@ -103,49 +427,20 @@ class DatabaseManager:
             True if messages table exists, False otherwise
         """
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Query sqlite_master to check if table exists
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='messages'"
-            )
-            result = cursor.fetchone()
-            conn.close()
+            with self._lock:
+                # Query sqlite_master to check if table exists
+                result = self._get_connection().execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name='messages'"
+                ).fetchone()
             
             # Table exists if result is not None
             return result is not None
-        except Exception:
-            # Database error - consider as not ready
+        except sqlite3.Error:
+            # SQLite-level failure (locked, corrupt, unreadable file) -
+            # report not ready. Anything else is a programming error
+            # and should surface, not read as "unhealthy".
             return False
     
-    def message_exists(self, message_id: str) -> bool:
-        """Check if a message with given ID already exists (duplicate detection).
-        
-        Used for idempotent message ingestion - if a duplicate arrives,
-        we return 200 OK without re-inserting.
-        
-        Args:
-            message_id: The message ID to check for
-            
-        Returns:
-            True if message exists, False otherwise
-        """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Query for the message
-        cursor.execute(
-            "SELECT 1 FROM messages WHERE message_id = ? LIMIT 1",
-            (message_id,)
-        )
-        
-        # Check if result was found
-        exists = cursor.fetchone() is not None
-        conn.close()
-        
-        return exists
-    
     def insert_message(
         self,
         message_id: str,
@@ -153,11 +448,11 @@ class DatabaseManager:
         to_msisdn: str,
         ts: str,
         text: Optional[str]
-    ):
-        """Insert a new message into the database.
+    ) -> bool:
+        """Insert a new message into the database, ignoring duplicates.
         
-        Gracefully handles duplicates - if message with same ID exists,
-        ignores the insert (idempotency).
+        A single INSERT OR IGNORE both inserts and detects duplicates,
+        so the caller doesn't need a separate exists-check round trip.
         
         Args:
             message_id: Unique message identifier
@@ -165,27 +460,70 @@ class DatabaseManager:
             to_msisdn: Recipient phone number
             ts: Message timestamp
             text: Optional message text content
+            
+        Returns:
+            True if a new row was inserted, False if a message with the
+            same message_id already existed (idempotent duplicate)
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
         # Current timestamp when message is received (server-side)
         created_at = datetime.utcnow().isoformat() + "Z"
         
-        try:
-            # Insert the message
-            cursor.execute("""
-                INSERT INTO messages (message_id, from_msisdn, to_msisdn, ts, text, created_at)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (message_id, from_msisdn, to_msisdn, ts, text, created_at))
+        with self._lock:
+            # Insert the message (autocommit - no explicit commit needed)
+            # OR IGNORE makes a PRIMARY KEY clash a no-op instead of an
+            # IntegrityError, so no exception handling is needed.
+            # ts is normalized to epoch microseconds for storage.
+            cursor = self._get_connection().execute(
+                _INSERT_SQL,
+                (message_id, from_msisdn, to_msisdn, _iso_to_epoch_us(ts), text, created_at)
+            )
+            
+            # rowcount is 1 for a real insert, 0 for an ignored duplicate
+            return cursor.rowcount == 1
+    
+    def insert_messages_bulk(
+        self,
+        messages: List[Tuple[str, str, str, str, Optional[str]]]
+    ) -> int:
+        """Insert many messages in one transaction, ignoring duplicates.
+        
+        Per-row inserts pay one implicit transaction (and under WAL,
+        one fsync) each. Batching all rows through executemany inside a
+        single explicit transaction amortizes that to one fsync per
+        batch, which is orders of magnitude faster for bursty or
+        backfill ingestion.
+        
+        Args:
+            messages: List of (message_id, from_msisdn, to_msisdn, ts,
+                text) tuples, with ts in ISO-8601 format
             
-            conn.commit()
-        except sqlite3.IntegrityError:
-            # PRIMARY KEY violation - message already exists, ignore
-            # This is a fallback to app-level duplicate detection
-            pass
-        finally:
-            conn.close()
+        Returns:
+            Number of rows actually inserted (duplicates are ignored
+            and not counted)
+        """
+        # Single server-side receive timestamp for the whole batch
+        created_at = datetime.utcnow().isoformat() + "Z"
+        
+        rows = [
+            (message_id, from_msisdn, to_msisdn, _iso_to_epoch_us(ts), text, created_at)
+            for message_id, from_msisdn, to_msisdn, ts, text in messages
+        ]
+        
+        with self._lock:
+            conn = self._get_connection()
+            # The connection runs in autocommit mode, so open an
+            # explicit transaction to get the one-commit-per-batch
+            # behavior rather than one per row
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.executemany(_INSERT_SQL, rows)
+                # For executemany, rowcount accumulates across all rows
+                inserted = cursor.rowcount
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return inserted
     
     def get_messages(
         self,
@@ -193,83 +531,114 @@ class DatabaseManager:
         offset: int = 0,
         from_filter: Optional[str] = None,
         since: Optional[str] = None,
-        text_search: Optional[str] = None
-    ) -> Tuple[List[Dict], int]:
+        text_search: Optional[str] = None,
+        after_ts: Optional[str] = None,
+        after_id: Optional[str] = None,
+        include_total: bool = False
+    ) -> Tuple[List[Dict], Optional[int]]:
         """Retrieve messages with pagination and filtering.
         
         This method supports multiple filter parameters and returns both
         the paginated results and total count for proper pagination UI.
         
+        Two pagination modes are supported: classic limit/offset, and
+        keyset ("seek") pagination via after_ts + after_id, which stays
+        O(limit) no matter how deep the page is - OFFSET still has to
+        walk and discard all skipped rows. Keyset is preferred for deep
+        pagination; when both are given, keyset wins and offset is
+        ignored.
+        
         Args:
             limit: Number of results per page (1-100)
             offset: Number of results to skip (for pagination)
             from_filter: Filter by sender phone number (exact match)
             since: Filter messages received after this timestamp (ISO-8601)
             text_search: Full-text search in message text (uses LIKE)
+            after_ts: Keyset cursor - timestamp of the last row already
+                seen (ISO-8601); must be passed together with after_id
+            after_id: Keyset cursor - message_id of the last row already
+                seen, breaking ties between equal timestamps
+            include_total: Compute the total matching count. Off by
+                default - counting scans the whole matching set, so
+                callers only pay for it when they ask. The unfiltered
+                total is served from the trigger-maintained meta table
+                without any scan at all.
             
         Returns:
             Tuple of (messages_list, total_count)
                 - messages_list: List of message dictionaries
-                - total_count: Total messages matching filters (not just returned count)
+                - total_count: Total messages matching filters, or None
+                  when include_total is False
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Build WHERE clause dynamically based on provided filters
-        where_clauses = []
+        # Collect bind parameters for whichever filters are present;
+        # the matching prebuilt SQL pair is looked up by filter shape
         params = []
         
         # Add sender filter if provided
         if from_filter:
-            where_clauses.append("from_msisdn = ?")
             params.append(from_filter)
         
         # Add timestamp filter if provided
-        # Returns messages with timestamp >= since
+        # Returns messages with timestamp >= since; normalized to epoch
+        # microseconds once here so the index probe is an int compare
+        # (raises ValueError for the caller if the string is invalid)
         if since:
-            where_clauses.append("ts >= ?")
-            params.append(since)
+            params.append(_iso_to_epoch_us(since))
         
-        # Add text search filter if provided
-        # Uses LIKE for substring matching
+        # Add text search filter if provided. With FTS5 the term walks
+        # the inverted index as a quoted phrase (word-level matching);
+        # without it, LIKE substring matching is the fallback.
         if text_search:
-            where_clauses.append("text LIKE ?")
-            params.append(f"%{text_search}%")
-        
-        # Combine all WHERE clauses with AND, or use "1=1" if no filters
-        where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
-        
-        # Get total count of messages matching filters
-        # This is used for pagination UI to know total available results
-        count_query = f"SELECT COUNT(*) FROM messages WHERE {where_sql}"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()[0]
-        
-        # Get paginated results with consistent ordering
-        # Ordered by timestamp (ASC) then message_id (ASC) for deterministic results
-        data_query = f"""
-            SELECT message_id, from_msisdn, to_msisdn, ts, text
-            FROM messages
-            WHERE {where_sql}
-            ORDER BY ts ASC, message_id ASC
-            LIMIT ? OFFSET ?
-        """
-        cursor.execute(data_query, params + [limit, offset])
-        
-        # Convert rows to dictionaries
-        rows = cursor.fetchall()
-        messages = [
-            {
-                "message_id": row["message_id"],
-                "from": row["from_msisdn"],
-                "to": row["to_msisdn"],
-                "ts": row["ts"],
-                "text": row["text"]
-            }
-            for row in rows
+            if self._fts_enabled:
+                params.append(_fts_phrase(text_search))
+            else:
+                params.append(f"%{text_search}%")
+        
+        # Look up the prebuilt SQL for this filter shape
+        count_query, data_query, keyset_query = _MESSAGES_QUERIES[
+            (bool(from_filter), bool(since), bool(text_search), self._fts_enabled)
         ]
         
-        conn.close()
+        # Keyset pagination seeks past the cursor row instead of
+        # discarding offset rows
+        use_keyset = after_ts is not None and after_id is not None
+        
+        with self._lock:
+            conn = self._get_connection()
+            
+            # Total count only on request - it's a full scan of the
+            # matching set. The no-filter case short-circuits to the
+            # trigger-maintained counter in meta (a single-row read).
+            total = None
+            if include_total:
+                if params:
+                    total = conn.execute(count_query, params).fetchone()[0]
+                else:
+                    total = conn.execute(
+                        "SELECT message_count FROM meta WHERE id = 1"
+                    ).fetchone()[0]
+            
+            # Get paginated results with consistent ordering
+            # Ordered by timestamp (ASC) then message_id (ASC) for deterministic results
+            if use_keyset:
+                result = conn.execute(
+                    keyset_query,
+                    params + [_iso_to_epoch_us(after_ts), after_id, limit]
+                )
+            else:
+                result = conn.execute(data_query, params + [limit, offset])
+            
+            # Build the dicts straight off the result iterator - no
+            # intermediate fetchall() list (must happen under the lock,
+            # while the implicit cursor is still ours). Rows iterate in
+            # SELECT order, so zipping against the hoisted key tuple
+            # also maps from_msisdn/to_msisdn to the API's from/to.
+            messages = [dict(zip(_ROW_KEYS, row)) for row in result]
+        
+        # Render stored epoch-microsecond timestamps back to ISO-8601
+        for message in messages:
+            message["ts"] = _epoch_us_to_iso(message["ts"])
+        
         return messages, total
     
     def get_stats(self) -> Dict:
@@ -289,39 +658,24 @@ class DatabaseManager:
                 - first_message_ts: Timestamp of earliest message (or None)
                 - last_message_ts: Timestamp of latest message (or None)
         """
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        # Count total messages in database
-        cursor.execute("SELECT COUNT(*) FROM messages")
-        total_messages = cursor.fetchone()[0]
-        
-        # Count unique senders (distinct phone numbers)
-        cursor.execute("SELECT COUNT(DISTINCT from_msisdn) FROM messages")
-        senders_count = cursor.fetchone()[0]
-        
-        # Get top 10 senders by message count (aggregation)
-        # Ordered by count descending to show most active senders first
-        cursor.execute("""
-            SELECT from_msisdn, COUNT(*) as count
-            FROM messages
-            GROUP BY from_msisdn
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        messages_per_sender = [
-            {"from": row["from_msisdn"], "count": row["count"]}
-            for row in cursor.fetchall()
-        ]
-        
-        # Get first and last message timestamps
-        # Used to show time range of data in database
-        cursor.execute("SELECT MIN(ts) as first_ts, MAX(ts) as last_ts FROM messages")
-        row = cursor.fetchone()
-        first_message_ts = row["first_ts"]
-        last_message_ts = row["last_ts"]
-        
-        conn.close()
+        with self._lock:
+            conn = self._get_connection()
+            
+            # Total count and timestamp range come from the single meta
+            # row the insert trigger maintains - no scan of messages
+            total_messages, first_ts, last_ts = conn.execute(_STATS_META_SQL).fetchone()
+            first_message_ts = _epoch_us_to_iso(first_ts)
+            last_message_ts = _epoch_us_to_iso(last_ts)
+            
+            # Unique senders = rows in the per-sender aggregate table
+            senders_count = conn.execute(_STATS_SENDERS_SQL).fetchone()[0]
+            
+            # Top 10 senders straight off the aggregate counts
+            # Ordered by count descending to show most active senders first
+            messages_per_sender = [
+                {"from": sender, "count": count}
+                for sender, count in conn.execute(_STATS_TOP_SENDERS_SQL)
+            ]
         
         # Return all statistics as dictionary
         return {
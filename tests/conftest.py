@@ -9,11 +9,16 @@ import sys
 import os
 import tempfile
 
-# Add parent directory to path so we can import from it
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from fastapi.testclient import TestClient
 
-from app.main import app, db_manager
-from app.config import settings
+# Add app directory to path so tests can import from it (same flat
+# imports the app modules themselves use). conftest is imported before
+# any test module is collected, so this is the one place that mutates
+# sys.path - test modules just import main/config directly.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+
+from main import app, db_manager
+from config import settings
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -33,9 +38,13 @@ def setup_test_db():
         After all tests complete, cleans up the temporary database file
     """
     # Create temporary directory for test database
-    # tempfile.mkdtemp() creates a unique directory that will be cleaned up
+    # tempfile.mkdtemp() creates a unique directory that will be cleaned up.
+    # Each pytest-xdist worker is its own process and gets its own
+    # mkdtemp, so workers never contend on one SQLite file; the worker
+    # id in the filename just makes that obvious when inspecting /tmp.
     temp_dir = tempfile.mkdtemp()
-    db_path = os.path.join(temp_dir, "test.db")
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    db_path = os.path.join(temp_dir, f"test-{worker}.db")
     
     # Update config to use test database instead of production database
     # This ensures tests don't affect real data
@@ -78,20 +87,38 @@ def clear_db():
     Yields:
         The test runs between setup and cleanup
     """
-    # Get database connection
-    conn = db_manager._get_connection()
-    cursor = conn.cursor()
-    
-    # Delete all messages from database
-    # This ensures each test starts with an empty database
-    cursor.execute("DELETE FROM messages")
-    
-    # Commit the deletion
-    conn.commit()
-    conn.close()
-    
+    # Reset by dropping and recreating the schema - O(1) regardless of
+    # how many rows a test inserted, where DELETE FROM tombstones row
+    # by row and fires the per-row stats/FTS triggers for each one.
+    # Dropping messages also drops its triggers; the aggregate and FTS
+    # tables must go with it so init_db reseeds them from scratch.
+    # (Shared persistent connection, autocommit - no commit, no close.)
+    db_manager._get_connection().executescript("""
+        DROP TABLE IF EXISTS messages;
+        DROP TABLE IF EXISTS messages_fts;
+        DROP TABLE IF EXISTS sender_counts;
+        DROP TABLE IF EXISTS meta;
+    """)
+    db_manager.init_db()
+
     # Yield control to run the test
     yield
     
     # Cleanup happens automatically after test completes
     # (next iteration will clear again before next test)
+
+
+@pytest.fixture(scope="session")
+def client(setup_test_db):
+    """One TestClient shared by the whole session.
+
+    The context manager drives the app lifespan, so startup (init_db)
+    and shutdown each run exactly once for the suite instead of being
+    implicitly re-entered per module. Depends on setup_test_db so the
+    test database path is configured before the lifespan runs.
+
+    Yields:
+        TestClient wired to the app with lifespan active
+    """
+    with TestClient(app) as test_client:
+        yield test_client
@@ -1,50 +1,33 @@
-import hmac
-import hashlib
-import json
-import pytest
-from fastapi.testclient import TestClient
-import sys
-import os
+import base64
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+import orjson
+import pytest
 
-from main import app
+# conftest.py puts the app directory on sys.path before collection
+from main import db_manager
 from config import settings
 
-client = TestClient(app)
 settings.webhook_secret = "testsecret"
 
 
-def compute_signature(body: str) -> str:
-    return hmac.new(
-        "testsecret".encode(),
-        body.encode(),
-        hashlib.sha256
-    ).hexdigest()
-
-
 def insert_test_message(message_id: str, from_num: str, ts: str, text: str):
-    """Helper to insert test messages"""
-    body = json.dumps({
-        "message_id": message_id,
-        "from": from_num,
-        "to": "+14155550100",
-        "ts": ts,
-        "text": text
-    })
-    signature = compute_signature(body)
-    
-    client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
+    """Helper to insert test messages.
+    
+    Writes through db_manager directly - the HTTP + HMAC webhook path
+    has its own dedicated tests in test_webhook.py, so fixture rows
+    don't need to pay routing, validation and signature verification
+    per insert.
+    """
+    db_manager.insert_message(
+        message_id=message_id,
+        from_msisdn=from_num,
+        to_msisdn="+14155550100",
+        ts=ts,
+        text=text
     )
 
 
-def test_messages_basic_list():
+def test_messages_basic_list(client):
     """Test basic message listing"""
     # Insert test messages
     insert_test_message("msg1", "+911111111111", "2025-01-15T09:00:00Z", "First")
@@ -53,7 +36,7 @@ def test_messages_basic_list():
     response = client.get("/messages")
     
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     assert "data" in data
     assert "total" in data
     assert "limit" in data
@@ -62,7 +45,7 @@ def test_messages_basic_list():
     assert data["offset"] == 0
 
 
-def test_messages_pagination():
+def test_messages_pagination(client):
     """Test pagination with limit and offset"""
     # Insert multiple messages
     for i in range(5):
@@ -75,51 +58,118 @@ def test_messages_pagination():
     
     # First page
     response = client.get("/messages?limit=2&offset=0")
-    data = response.json()
+    data = orjson.loads(response.content)
     assert len(data["data"]) <= 2
     assert data["limit"] == 2
     assert data["offset"] == 0
     
     # Second page
     response = client.get("/messages?limit=2&offset=2")
-    data = response.json()
+    data = orjson.loads(response.content)
     assert data["offset"] == 2
 
 
-def test_messages_filter_by_sender():
+def test_messages_keyset_pagination(client):
+    """Test cursor-based pagination via next_cursor and after_ts/after_id"""
+    for i in range(5):
+        insert_test_message(
+            f"key{i}",
+            "+913333333333",
+            f"2025-01-15T{10+i:02d}:00:00Z",
+            f"Message {i}"
+        )
+
+    # First page is full, so it carries a cursor for the next one
+    response = client.get("/messages?limit=2")
+    data = orjson.loads(response.content)
+    assert [m["message_id"] for m in data["data"]] == ["key0", "key1"]
+    assert data["next_cursor"] is not None
+
+    # The cursor is base64 "ts|message_id" of the last row on the page
+    after_ts, after_id = base64.urlsafe_b64decode(data["next_cursor"]).decode().split("|")
+    assert (after_ts, after_id) == ("2025-01-15T11:00:00Z", "key1")
+
+    # Second page continues from the cursor position
+    response = client.get(
+        "/messages", params={"limit": 2, "after_ts": after_ts, "after_id": after_id}
+    )
+    data = orjson.loads(response.content)
+    assert [m["message_id"] for m in data["data"]] == ["key2", "key3"]
+
+    # Last (short) page has no next cursor
+    after_ts, after_id = base64.urlsafe_b64decode(data["next_cursor"]).decode().split("|")
+    response = client.get(
+        "/messages", params={"limit": 2, "after_ts": after_ts, "after_id": after_id}
+    )
+    data = orjson.loads(response.content)
+    assert [m["message_id"] for m in data["data"]] == ["key4"]
+    assert data["next_cursor"] is None
+
+
+def test_messages_keyset_invalid_cursor(client):
+    """Test that a malformed after_ts is rejected"""
+    response = client.get("/messages?after_ts=not-a-timestamp&after_id=x")
+    assert response.status_code == 422
+    assert orjson.loads(response.content)["detail"] == "invalid timestamp parameter"
+
+
+def test_messages_include_total(client):
+    """Test that total is opt-in via include_total"""
+    insert_test_message("tot1", "+911111111111", "2025-01-15T09:00:00Z", "One")
+    insert_test_message("tot2", "+911111111111", "2025-01-15T10:00:00Z", "Two")
+    insert_test_message("tot3", "+912222222222", "2025-01-15T11:00:00Z", "Three")
+
+    # Default: no count is computed
+    response = client.get("/messages")
+    data = orjson.loads(response.content)
+    assert data["total"] is None
+
+    # Unfiltered total comes from the trigger-maintained meta table
+    response = client.get("/messages?include_total=1")
+    data = orjson.loads(response.content)
+    assert data["total"] == 3
+
+    # Filtered total falls back to a COUNT(*) over the filtered set
+    response = client.get("/messages?include_total=1&from=%2B911111111111")
+    data = orjson.loads(response.content)
+    assert data["total"] == 2
+    assert len(data["data"]) == 2
+
+
+def test_messages_filter_by_sender(client):
     """Test filtering by sender"""
     sender = "+914444444444"
     insert_test_message("filter1", sender, "2025-01-15T11:00:00Z", "Test 1")
     insert_test_message("filter2", "+915555555555", "2025-01-15T11:01:00Z", "Test 2")
     
     response = client.get(f"/messages?from={sender}")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # All returned messages should be from the specified sender
     for msg in data["data"]:
         assert msg["from"] == sender
 
 
-def test_messages_filter_by_since():
+def test_messages_filter_by_since(client):
     """Test filtering by timestamp"""
     insert_test_message("time1", "+916666666666", "2025-01-15T08:00:00Z", "Early")
     insert_test_message("time2", "+916666666666", "2025-01-15T12:00:00Z", "Late")
     
     response = client.get("/messages?since=2025-01-15T10:00:00Z")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # All messages should be after the since timestamp
     for msg in data["data"]:
         assert msg["ts"] >= "2025-01-15T10:00:00Z"
 
 
-def test_messages_text_search():
+def test_messages_text_search(client):
     """Test text search"""
     insert_test_message("search1", "+917777777777", "2025-01-15T13:00:00Z", "Hello World")
     insert_test_message("search2", "+917777777777", "2025-01-15T13:01:00Z", "Goodbye")
     
     response = client.get("/messages?q=Hello")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # Should only return messages containing "Hello"
     for msg in data["data"]:
@@ -127,14 +177,14 @@ def test_messages_text_search():
             assert "Hello" in msg["text"] or "hello" in msg["text"].lower()
 
 
-def test_messages_ordering():
+def test_messages_ordering(client):
     """Test that messages are ordered by ts ASC, message_id ASC"""
     insert_test_message("order1", "+918888888888", "2025-01-15T14:00:00Z", "A")
     insert_test_message("order2", "+918888888888", "2025-01-15T14:00:00Z", "B")
     insert_test_message("order3", "+918888888888", "2025-01-15T14:01:00Z", "C")
     
     response = client.get("/messages?from=+918888888888")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     messages = data["data"]
     
@@ -151,7 +201,7 @@ def test_messages_ordering():
             assert curr["message_id"] <= next_msg["message_id"]
 
 
-def test_messages_limit_bounds():
+def test_messages_limit_bounds(client):
     """Test limit parameter bounds"""
     # Max limit
     response = client.get("/messages?limit=100")
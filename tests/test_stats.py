@@ -1,55 +1,36 @@
-import hmac
-import hashlib
-import json
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-import sys
-import os
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
-
-from main import app
+# conftest.py puts the app directory on sys.path before collection
+from main import db_manager
 from config import settings
 
-client = TestClient(app)
 settings.webhook_secret = "testsecret"
 
 
-def compute_signature(body: str) -> str:
-    return hmac.new(
-        "testsecret".encode(),
-        body.encode(),
-        hashlib.sha256
-    ).hexdigest()
-
-
 def insert_test_message(message_id: str, from_num: str, ts: str, text: str):
-    """Helper to insert test messages"""
-    body = json.dumps({
-        "message_id": message_id,
-        "from": from_num,
-        "to": "+14155550100",
-        "ts": ts,
-        "text": text
-    })
-    signature = compute_signature(body)
-    
-    client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
+    """Helper to insert test messages.
+    
+    Writes through db_manager directly - the HTTP + HMAC webhook path
+    has its own dedicated tests in test_webhook.py, so fixture rows
+    don't need to pay routing, validation and signature verification
+    per insert.
+    """
+    db_manager.insert_message(
+        message_id=message_id,
+        from_msisdn=from_num,
+        to_msisdn="+14155550100",
+        ts=ts,
+        text=text
     )
 
 
-def test_stats_empty():
+def test_stats_empty(client):
     """Test stats with no messages"""
     response = client.get("/stats")
     
     assert response.status_code == 200
-    data = response.json()
+    data = orjson.loads(response.content)
     
     assert "total_messages" in data
     assert "senders_count" in data
@@ -58,7 +39,7 @@ def test_stats_empty():
     assert "last_message_ts" in data
 
 
-def test_stats_basic():
+def test_stats_basic(client):
     """Test basic stats calculation"""
     # Insert test messages
     insert_test_message("stats1", "+911111111111", "2025-01-15T09:00:00Z", "A")
@@ -66,14 +47,14 @@ def test_stats_basic():
     insert_test_message("stats3", "+912222222222", "2025-01-15T11:00:00Z", "C")
     
     response = client.get("/stats")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     assert data["total_messages"] >= 3
     assert data["senders_count"] >= 2
     assert len(data["messages_per_sender"]) >= 2
 
 
-def test_stats_messages_per_sender():
+def test_stats_messages_per_sender(client):
     """Test messages per sender calculation"""
     sender1 = "+913333333333"
     sender2 = "+914444444444"
@@ -86,7 +67,7 @@ def test_stats_messages_per_sender():
         insert_test_message(f"sender2_{i}", sender2, f"2025-01-15T{17+i:02d}:00:00Z", f"Msg {i}")
     
     response = client.get("/stats")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # Find our senders in the top senders list
     sender1_count = next((s["count"] for s in data["messages_per_sender"] if s["from"] == sender1), 0)
@@ -96,7 +77,7 @@ def test_stats_messages_per_sender():
     assert sender2_count >= 3
 
 
-def test_stats_timestamp_bounds():
+def test_stats_timestamp_bounds(client):
     """Test first and last message timestamps"""
     # Insert messages with known timestamps
     early_ts = "2025-01-15T06:00:00Z"
@@ -106,7 +87,7 @@ def test_stats_timestamp_bounds():
     insert_test_message("late", "+915555555555", late_ts, "Late")
     
     response = client.get("/stats")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # First message should be <= our early timestamp
     assert data["first_message_ts"] <= early_ts
@@ -115,7 +96,7 @@ def test_stats_timestamp_bounds():
     assert data["last_message_ts"] >= late_ts
 
 
-def test_stats_top_senders_limit():
+def test_stats_top_senders_limit(client):
     """Test that messages_per_sender returns max 10 senders"""
     # Insert messages from many senders
     for i in range(15):
@@ -123,13 +104,13 @@ def test_stats_top_senders_limit():
         insert_test_message(f"many_{i}", sender, f"2025-01-16T{10:02d}:{i:02d}:00Z", f"Test {i}")
     
     response = client.get("/stats")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # Should return at most 10 senders
     assert len(data["messages_per_sender"]) <= 10
 
 
-def test_stats_sender_ordering():
+def test_stats_sender_ordering(client):
     """Test that senders are ordered by count descending"""
     sender_a = "+916666666666"
     sender_b = "+917777777777"
@@ -143,7 +124,7 @@ def test_stats_sender_ordering():
         insert_test_message(f"b_{i}", sender_b, f"2025-01-17T{11:02d}:{i:02d}:00Z", f"B{i}")
     
     response = client.get("/stats")
-    data = response.json()
+    data = orjson.loads(response.content)
     
     # Find positions
     sender_a_pos = next((i for i, s in enumerate(data["messages_per_sender"]) if s["from"] == sender_a), None)
@@ -8,361 +8,316 @@ These tests verify:
 - Missing required fields are rejected
 """
 
+import asyncio
 import hmac
-import hashlib
-import json
-import pytest
-from fastapi.testclient import TestClient
-import sys
-import os
+from functools import lru_cache
 
-# Add parent directory to path so we can import from app
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
+import httpx
+import orjson
+import pytest
 
-from main import app
+# conftest.py puts the app directory on sys.path before collection
+from main import app, db_manager
 from config import settings
 
-# Create test client for making HTTP requests to the app
-client = TestClient(app)
-
 # Set test secret for all tests
 settings.webhook_secret = "testsecret"
 
 
-def compute_signature(body: str, secret: str = "testsecret") -> str:
+@pytest.fixture
+def anyio_backend():
+    """Run anyio-marked tests on asyncio only (the app's event loop)."""
+    return "asyncio"
+
+
+# Pre-encoded test secret - hmac.digest wants bytes, and encoding once
+# at import beats a str.encode() per signature
+_SECRET = b"testsecret"
+
+
+@lru_cache(maxsize=128)
+def compute_signature(body: bytes, secret: bytes = _SECRET) -> str:
     """Helper function to compute HMAC-SHA256 signature.
-    
+
     Computes the same signature that clients should send in X-Signature header.
-    
+    Memoized - the suite signs the same handful of literal bodies over
+    and over, so repeat calls skip the SHA-256 work entirely (the
+    secret is part of the cache key, so tests using other keys stay
+    correct). Cache misses go through hmac.digest, the one-shot C path
+    that skips allocating an HMAC object per call.
+
     Args:
-        body: JSON string to sign (raw request body)
-        secret: Secret key for HMAC
-        
+        body: Raw request body bytes to sign (as orjson.dumps returns)
+        secret: Secret key bytes for HMAC
+
     Returns:
         Hex string signature
     """
-    return hmac.new(
-        secret.encode(),  # Convert secret to bytes
-        body.encode(),  # Convert body to bytes
-        hashlib.sha256  # Use SHA256 algorithm
-    ).hexdigest()  # Return as hex string
+    return hmac.digest(secret, body, "sha256").hex()
+
+
+# Base well-formed payload; tests vary it via make_body overrides
+# instead of each spelling out a nearly identical dict
+BASE = {
+    "message_id": "test1",
+    "from": "+919876543210",
+    "to": "+14155550100",
+    "ts": "2025-01-15T10:00:00Z",
+    "text": "Hello"
+}
+
+# Sentinel override value meaning "drop this field from the payload"
+_OMIT = object()
+
+
+@lru_cache(maxsize=64)
+def _build_body(items: frozenset) -> bytes:
+    """Serialize BASE with the given override items applied (cached)."""
+    data = {**BASE}
+    for key, value in items:
+        if value is _OMIT:
+            data.pop(key, None)
+        else:
+            data[key] = value
+    return orjson.dumps(data)
+
+
+def make_body(**overrides) -> bytes:
+    """Build a request body as BASE plus keyword overrides.
+
+    Pass _OMIT as a value to leave a field out entirely. Serialization
+    is memoized per unique override set, so repeated bodies cost one
+    orjson.dumps for the whole suite.
+
+    Returns:
+        JSON body bytes ready to sign and POST
+    """
+    return _build_body(frozenset(overrides.items()))
+
+
+# Payloads and signatures are constants, so serialize and sign them
+# once at import - each test then just references its precomputed pair
+# instead of re-serializing and re-hashing per run.
+BODY_VALID = make_body()
+SIG_VALID = compute_signature(BODY_VALID)
+
+BODY_DUPLICATE = make_body(message_id="test2", text="Duplicate test")
+SIG_DUPLICATE = compute_signature(BODY_DUPLICATE)
+
+# Used for the invalid- and missing-signature tests, so no signature
+BODY_UNSIGNED = make_body(message_id="test3", text="Test")
 
+# The validation-failure bodies never get past Pydantic on the server,
+# so there's nothing gained by building them from dicts - they're raw
+# byte literals, with the malformed field called out inline.
+BODY_BAD_PHONE = (  # "from" missing the + prefix
+    b'{"message_id":"test5","from":"919876543210","to":"+14155550100",'
+    b'"ts":"2025-01-15T10:00:00Z","text":"Test"}'
+)
+SIG_BAD_PHONE = compute_signature(BODY_BAD_PHONE)
 
-def test_webhook_valid_message():
+BODY_BAD_TS = (  # "ts" missing the trailing Z
+    b'{"message_id":"test6","from":"+919876543210","to":"+14155550100",'
+    b'"ts":"2025-01-15T10:00:00","text":"Test"}'
+)
+SIG_BAD_TS = compute_signature(BODY_BAD_TS)
+
+BODY_MISSING_FIELD = (  # no message_id, a required field
+    b'{"from":"+919876543210","to":"+14155550100",'
+    b'"ts":"2025-01-15T10:00:00Z"}'
+)
+SIG_MISSING_FIELD = compute_signature(BODY_MISSING_FIELD)
+
+BODY_NO_TEXT = make_body(message_id="test7", text=_OMIT)
+SIG_NO_TEXT = compute_signature(BODY_NO_TEXT)
+
+
+def test_webhook_valid_message(client):
     """Test that a valid message with correct signature is accepted.
-    
+
     This test verifies the happy path:
     - Valid message structure
     - Correct signature
     - Should return 200 OK
     """
-    # Create a valid message body
-    body = json.dumps({
-        "message_id": "test1",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Hello"
-    })
-    
-    # Compute correct signature for this body
-    signature = compute_signature(body)
-    
     # Send POST request to /webhook endpoint
     response = client.post(
         "/webhook",
-        content=body,  # Send body as string (not JSON)
+        content=BODY_VALID,  # Send raw body bytes (exactly what was signed)
         headers={
             "Content-Type": "application/json",
-            "X-Signature": signature  # Add signature header
+            "X-Signature": SIG_VALID  # Add signature header
         }
     )
-    
-    # Verify response
+
+    # Verify response - raw byte compare against orjson's canonical
+    # output, no decode needed
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    assert response.content == b'{"status":"ok"}'
 
 
-def test_webhook_duplicate_message():
+@pytest.mark.anyio
+async def test_webhook_duplicate_message():
     """Test that duplicate messages are handled idempotently.
-    
+
     Idempotency means:
-    - Sending the same request twice should have same effect as sending once
-    - Both requests should return 200 OK
-    - Message should only be stored once
+    - Sending the same request N times has the same effect as once
+    - Every request returns 200 OK
+    - Message is only stored once
+
+    A whole burst of identical requests goes out concurrently via an
+    ASGI-transport AsyncClient, exercising the INSERT OR IGNORE
+    duplicate path under contention rather than sequentially - and
+    finishing in roughly one request's wall time.
     """
-    # Create a message body
-    body = json.dumps({
-        "message_id": "test2",  # Same message_id as before
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Duplicate test"
-    })
-    
-    # Compute signature
-    signature = compute_signature(body)
-    
-    # Prepare headers for both requests
+    # Same body and signature for every request in the burst
     headers = {
         "Content-Type": "application/json",
-        "X-Signature": signature
+        "X-Signature": SIG_DUPLICATE
     }
-    
-    # First request - inserts the message
-    response1 = client.post("/webhook", content=body, headers=headers)
-    assert response1.status_code == 200
-    
-    # Duplicate request - should also return 200 (not 409 Conflict or error)
-    response2 = client.post("/webhook", content=body, headers=headers)
-    assert response2.status_code == 200
-    assert response2.json() == {"status": "ok"}
-    
-    # Verify by checking /messages endpoint that message appears once
-    # (This would be in another test - here we just verify idempotency)
-
-
-def test_webhook_invalid_signature():
-    """Test that requests with invalid signatures are rejected.
-    
-    This is a security test - ensures only authorized clients can send webhooks.
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as async_client:
+        # All requests in flight at once - whichever land after the
+        # first must still see 200, not 409 Conflict or an error
+        responses = await asyncio.gather(*[
+            async_client.post("/webhook", content=BODY_DUPLICATE, headers=headers)
+            for _ in range(8)
+        ])
+
+    for response in responses:
+        assert response.status_code == 200
+        assert response.content == b'{"status":"ok"}'
+
+    # However the burst interleaved, exactly one row was stored
+    rows, _ = db_manager.get_messages(limit=100)
+    assert sum(row["message_id"] == "test2" for row in rows) == 1
+
+
+@pytest.mark.parametrize(
+    "body,signature,expected_status,expected_content",
+    [
+        pytest.param(
+            BODY_UNSIGNED, "invalidsignature", 401, b'{"detail":"invalid signature"}',
+            id="invalid-signature",
+        ),
+        pytest.param(
+            BODY_UNSIGNED, None, 401, None,
+            id="missing-signature",
+        ),
+        pytest.param(
+            BODY_BAD_PHONE, SIG_BAD_PHONE, 422, None,
+            id="invalid-phone-format",
+        ),
+        pytest.param(
+            BODY_BAD_TS, SIG_BAD_TS, 422, None,
+            id="invalid-timestamp",
+        ),
+        pytest.param(
+            BODY_MISSING_FIELD, SIG_MISSING_FIELD, 422, None,
+            id="missing-required-field",
+        ),
+        pytest.param(
+            BODY_NO_TEXT, SIG_NO_TEXT, 200, b'{"status":"ok"}',
+            id="text-optional",
+        ),
+    ],
+)
+def test_webhook_validation(client, body, signature, expected_status, expected_content):
+    """Signature and payload validation cases, one POST each.
+
+    Covers: wrong signature and missing signature (401, security),
+    non-E.164 phone, malformed timestamp and missing required field
+    (422, validation), and the optional text field (200). Replaces a
+    set of copy-paste tests that each rebuilt the same request.
+    Expected bodies are raw bytes - the server's compact JSON output
+    is deterministic, so a byte compare beats a parse.
     """
-    # Create a message body
-    body = json.dumps({
-        "message_id": "test3",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Test"
-    })
-    
-    # Send request with WRONG signature
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": "invalidsignature"  # This is not the correct signature
-        }
-    )
-    
-    # Should return 401 Unauthorized
-    assert response.status_code == 401
-    assert response.json() == {"detail": "invalid signature"}
-
-
-def test_webhook_missing_signature():
-    """Test that requests without signature are rejected."""
-    body = json.dumps({
-        "message_id": "test4",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Test"
-    })
-    
-    # Send request WITHOUT X-Signature header
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={"Content-Type": "application/json"}
-    )
-    
-    # Should return 401 because signature is missing/invalid
-    assert response.status_code == 401
+    headers = {"Content-Type": "application/json"}
+    if signature is not None:
+        headers["X-Signature"] = signature
 
+    response = client.post("/webhook", content=body, headers=headers)
 
-def test_webhook_invalid_phone_format():
-    """Test that invalid phone numbers are rejected.
-    
-    Phone numbers must be in E.164 format: + followed by digits
-    """
-    body = json.dumps({
-        "message_id": "test5",
-        "from": "919876543210",  # Missing + prefix
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Test"
-    })
-    
-    signature = compute_signature(body)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
-    )
-    
-    # Should return 422 Unprocessable Entity (validation error)
-    assert response.status_code == 422
+    assert response.status_code == expected_status
+    if expected_content is not None:
+        assert response.content == expected_content
 
 
-def test_webhook_invalid_timestamp():
-    """Test that invalid timestamps are rejected.
-    
-    Timestamps must be ISO-8601 UTC format, ending with 'Z'
-    """
-    body = json.dumps({
-        "message_id": "test6",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00",  # Missing 'Z' at end
-        "text": "Test"
-    })
-    
-    signature = compute_signature(body)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
-    )
-    
-    # Should return 422 Unprocessable Entity
-    assert response.status_code == 422
+# A three-message batch, signed once at import like the single bodies
+BODY_BATCH = orjson.dumps([
+    {**BASE, "message_id": f"batch{i}", "text": f"Batch {i}"}
+    for i in range(3)
+])
+SIG_BATCH = compute_signature(BODY_BATCH)
 
+# An object where the endpoint expects an array
+BODY_BATCH_NOT_ARRAY = BODY_VALID
+SIG_BATCH_NOT_ARRAY = compute_signature(BODY_BATCH_NOT_ARRAY)
 
-def test_webhook_missing_required_field():
-    """Test that missing required fields are rejected."""
-    body = json.dumps({
-        # Missing message_id - required field
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z"
-    })
-    
-    signature = compute_signature(body)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
-    )
-    
-    # Should return 422 Unprocessable Entity
-    assert response.status_code == 422
 
+def test_webhook_batch_insert_and_duplicates(client):
+    """Test batch ingestion counts: all-new, then all-duplicate.
 
-def test_webhook_optional_text_field():
-    """Test that text field is optional.
-    
-    Message can be stored without text content.
+    The same signed batch is posted twice - the first pass inserts
+    every message, the second finds them all already stored. Both
+    passes return 200 (batch retries are as idempotent as single
+    ones), with inserted/duplicates telling the two apart.
     """
-    body = json.dumps({
-        "message_id": "test7",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z"
-        # No text field provided
-    })
-    
-    signature = compute_signature(body)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
-    )
-    
-    # Should still return 200 OK
+    headers = {
+        "Content-Type": "application/json",
+        "X-Signature": SIG_BATCH
+    }
+
+    response = client.post("/webhook/batch", content=BODY_BATCH, headers=headers)
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
-
-
-def test_webhook_missing_signature():
-    """Test missing signature header"""
-    body = json.dumps({
-        "message_id": "test4",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Test"
-    })
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={"Content-Type": "application/json"}
-    )
-    
-    assert response.status_code == 401
+    assert response.content == b'{"status":"ok","inserted":3,"duplicates":0}'
 
+    # Retry of the same batch: nothing new, everything a duplicate
+    response = client.post("/webhook/batch", content=BODY_BATCH, headers=headers)
+    assert response.status_code == 200
+    assert response.content == b'{"status":"ok","inserted":0,"duplicates":3}'
 
-def test_webhook_invalid_phone_format():
-    """Test E.164 validation"""
-    body = json.dumps({
-        "message_id": "test5",
-        "from": "919876543210",  # Missing +
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z",
-        "text": "Test"
-    })
-    signature = compute_signature(body)
-    
-    response = client.post(
-        "/webhook",
-        content=body,
-        headers={
-            "Content-Type": "application/json",
-            "X-Signature": signature
-        }
-    )
-    
-    assert response.status_code == 422
+    # Each message was stored exactly once
+    rows, _ = db_manager.get_messages(limit=100)
+    assert sorted(
+        row["message_id"] for row in rows if row["message_id"].startswith("batch")
+    ) == ["batch0", "batch1", "batch2"]
 
 
-def test_webhook_invalid_timestamp():
-    """Test timestamp validation"""
-    body = json.dumps({
-        "message_id": "test6",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00",  # Missing Z
-        "text": "Test"
-    })
-    signature = compute_signature(body)
-    
+def test_webhook_batch_invalid_signature(client):
+    """Test that a batch with a wrong signature is rejected with 401."""
     response = client.post(
-        "/webhook",
-        content=body,
+        "/webhook/batch",
+        content=BODY_BATCH,
         headers={
             "Content-Type": "application/json",
-            "X-Signature": signature
+            "X-Signature": "invalidsignature"
         }
     )
-    
-    assert response.status_code == 422
 
+    assert response.status_code == 401
+    assert response.content == b'{"detail":"invalid signature"}'
+
+    # Nothing was stored
+    rows, _ = db_manager.get_messages(limit=100)
+    assert not any(row["message_id"].startswith("batch") for row in rows)
 
-def test_webhook_text_optional():
-    """Test that text field is optional"""
-    body = json.dumps({
-        "message_id": "test7",
-        "from": "+919876543210",
-        "to": "+14155550100",
-        "ts": "2025-01-15T10:00:00Z"
-    })
-    signature = compute_signature(body)
-    
+
+def test_webhook_batch_not_an_array(client):
+    """Test that a correctly signed non-array payload is a 422.
+
+    A single message object is valid on /webhook but not on
+    /webhook/batch, which validates the body as a message array.
+    """
     response = client.post(
-        "/webhook",
-        content=body,
+        "/webhook/batch",
+        content=BODY_BATCH_NOT_ARRAY,
         headers={
             "Content-Type": "application/json",
-            "X-Signature": signature
+            "X-Signature": SIG_BATCH_NOT_ARRAY
         }
     )
-    
-    assert response.status_code == 200
\ No newline at end of file
+
+    assert response.status_code == 422